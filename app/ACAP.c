@@ -434,6 +434,7 @@ void ACAP_HTTP_Process() {
     requestData.request = &request;
     requestData.method = FCGX_GetParam("REQUEST_METHOD", request.envp);
     requestData.contentType = FCGX_GetParam("CONTENT_TYPE", request.envp);
+    requestData.queryString = FCGX_GetParam("QUERY_STRING", request.envp);
     
     // Handle POST data
     if (requestData.method && strcmp(requestData.method, "POST") == 0) {
@@ -3,39 +3,67 @@
 Extract model parameters from TFLite model
 Generates model_params.h with quantization and dimension information
 Based on Axis ACAP SDK examples
+
+Usage:
+    python extract_model_params.py <model.tflite> [<model2.tflite> ...]
+
+With one model the header is written to model_params.h. With several models
+each header is written next to its model as <model>_params.h, so the Python
+interpreter is only started once.
+
+Parameters are read directly from the TFLite flatbuffer with the `tflite`
+schema package (pip install tflite); no TFLite interpreter is needed.
 """
 
+import os
 import sys
-import tensorflow as tf
 
-if len(sys.argv) > 1:
-    model_path = sys.argv[1]
-else:
-    print("Error: No model path provided. Usage: python extract_model_params.py <model.tflite>")
-    sys.exit(1)
+import tflite
 
-output_file = "model_params.h"
 
-try:
-    interpreter = tf.lite.Interpreter(model_path)
-    interpreter.allocate_tensors()
+def extract_params(model_path):
+    # Read the static tensor metadata straight from the flatbuffer; no
+    # interpreter, op resolver or delegate is created
+    with open(model_path, "rb") as f:
+        buf = f.read()
 
-    input_details = interpreter.get_input_details()
-    output_details = interpreter.get_output_details()
+    model = tflite.Model.GetRootAsModel(buf, 0)
+    subgraph = model.Subgraphs(0)
+    input_tensor = subgraph.Tensors(subgraph.Inputs(0))
+    output_tensor = subgraph.Tensors(subgraph.Outputs(0))
+
+    input_shape = [input_tensor.Shape(i) for i in range(input_tensor.ShapeLength())]
+    output_shape = [output_tensor.Shape(i) for i in range(output_tensor.ShapeLength())]
 
     # Input dimensions (NHWC format: batch, height, width, channels)
-    model_input_height = input_details[0]["shape"][1]
-    model_input_width = input_details[0]["shape"][2]
-    model_input_channels = input_details[0]["shape"][3]
+    model_input_height = input_shape[1]
+    model_input_width = input_shape[2]
+    model_input_channels = input_shape[3]
 
-    # Output quantization
-    quantization_scale, quantization_zero_point = output_details[0]['quantization']
+    # Output quantization (per-tensor; 0.0 / 0 if the output is not quantized)
+    quantization = output_tensor.Quantization()
+    if quantization is not None and quantization.ScaleLength() > 0:
+        quantization_scale = quantization.Scale(0)
+        quantization_zero_point = quantization.ZeroPoint(0)
+    else:
+        quantization_scale, quantization_zero_point = 0.0, 0
 
     # YOLOv5 output format: [batch, num_detections, (x,y,w,h,obj_conf + classes)]
-    num_detections = output_details[0]['shape'][1]
-    num_classes = output_details[0]['shape'][2] - 5  # Remove x,y,w,h,obj_conf
+    num_detections = output_shape[1]
+    num_classes = output_shape[2] - 5  # Remove x,y,w,h,obj_conf
+
+    return {
+        "model_input_height": model_input_height,
+        "model_input_width": model_input_width,
+        "model_input_channels": model_input_channels,
+        "quantization_scale": quantization_scale,
+        "quantization_zero_point": quantization_zero_point,
+        "num_classes": num_classes,
+        "num_detections": num_detections,
+    }
 
-    # Write header file
+
+def write_header(model_path, params, output_file):
     with open(output_file, "w") as f:
         f.write("/*\n")
         f.write(" * Auto-generated model parameters\n")
@@ -44,20 +72,37 @@ try:
         f.write(" */\n\n")
         f.write("#ifndef MODEL_PARAMS_H\n")
         f.write("#define MODEL_PARAMS_H\n\n")
-        f.write(f"#define MODEL_INPUT_HEIGHT {model_input_height}\n")
-        f.write(f"#define MODEL_INPUT_WIDTH {model_input_width}\n")
-        f.write(f"#define MODEL_INPUT_CHANNELS {model_input_channels}\n\n")
-        f.write(f"#define QUANTIZATION_SCALE {quantization_scale}f\n")
-        f.write(f"#define QUANTIZATION_ZERO_POINT {quantization_zero_point}\n\n")
-        f.write(f"#define NUM_CLASSES {num_classes}\n")
-        f.write(f"#define NUM_DETECTIONS {num_detections}\n\n")
+        f.write(f"#define MODEL_INPUT_HEIGHT {params['model_input_height']}\n")
+        f.write(f"#define MODEL_INPUT_WIDTH {params['model_input_width']}\n")
+        f.write(f"#define MODEL_INPUT_CHANNELS {params['model_input_channels']}\n\n")
+        f.write(f"#define QUANTIZATION_SCALE {params['quantization_scale']}f\n")
+        f.write(f"#define QUANTIZATION_ZERO_POINT {params['quantization_zero_point']}\n\n")
+        f.write(f"#define NUM_CLASSES {params['num_classes']}\n")
+        f.write(f"#define NUM_DETECTIONS {params['num_detections']}\n\n")
         f.write("#endif // MODEL_PARAMS_H\n")
 
-    print(f"✓ Model parameters extracted to {output_file}")
-    print(f"  - Model: {model_input_width}x{model_input_height}x{model_input_channels}")
-    print(f"  - Output: {num_detections} detections, {num_classes} classes")
-    print(f"  - Quantization: scale={quantization_scale:.15f}, zero_point={quantization_zero_point}")
 
-except Exception as e:
-    print(f"Error extracting model parameters: {e}", file=sys.stderr)
+if len(sys.argv) > 1:
+    model_paths = sys.argv[1:]
+else:
+    print("Error: No model path provided. Usage: python extract_model_params.py <model.tflite> [...]")
     sys.exit(1)
+
+for model_path in model_paths:
+    if len(model_paths) == 1:
+        output_file = "model_params.h"
+    else:
+        output_file = os.path.splitext(model_path)[0] + "_params.h"
+
+    try:
+        params = extract_params(model_path)
+        write_header(model_path, params, output_file)
+
+        print(f"✓ Model parameters extracted to {output_file}")
+        print(f"  - Model: {params['model_input_width']}x{params['model_input_height']}x{params['model_input_channels']}")
+        print(f"  - Output: {params['num_detections']} detections, {params['num_classes']} classes")
+        print(f"  - Quantization: scale={params['quantization_scale']:.15f}, zero_point={params['quantization_zero_point']}")
+
+    except Exception as e:
+        print(f"Error extracting model parameters from {model_path}: {e}", file=sys.stderr)
+        sys.exit(1)
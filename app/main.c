@@ -5,12 +5,17 @@
  * - GET  /capabilities    - Model information and requirements
  * - POST /inference/jpeg  - JPEG image inference endpoint
  * - POST /inference/tensor - Pre-processed tensor inference endpoint
+ * - POST /inference-jpeg-batch   - Multiple JPEG images in one multipart request
+ * - POST /inference-tensor-batch - Multiple tensors in one multipart request
  * - GET  /health          - Server health and statistics
  */
 
+#define _GNU_SOURCE  // memmem
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <strings.h>
 #include <syslog.h>
 #include <signal.h>
 #include <unistd.h>
@@ -31,6 +36,8 @@
 
 #define APP_PACKAGE	"detectx"
 
+#define MAX_BATCH_SIZE 32
+
 static GMainLoop* main_loop = NULL;
 
 // Signal handler for graceful shutdown
@@ -113,6 +120,25 @@ static void http_capabilities(ACAP_HTTP_Response response, const ACAP_HTTP_Reque
     cJSON_AddBoolToObject(tensor_format, "strict_dimensions", true);
     cJSON_AddItemToArray(formats, tensor_format);
 
+    // Batch formats (multipart/mixed, one image or tensor per part)
+    cJSON* jpeg_batch_format = cJSON_CreateObject();
+    cJSON_AddStringToObject(jpeg_batch_format, "endpoint", "/inference-jpeg-batch");
+    cJSON_AddStringToObject(jpeg_batch_format, "method", "POST");
+    cJSON_AddStringToObject(jpeg_batch_format, "content_type", "multipart/mixed");
+    cJSON_AddStringToObject(jpeg_batch_format, "description", "Multiple JPEG images, one per part (X-Image-Index part header)");
+    cJSON_AddNumberToObject(jpeg_batch_format, "max_batch_size", MAX_BATCH_SIZE);
+    cJSON_AddNumberToObject(jpeg_batch_format, "max_size_mb", MAX_IMAGE_SIZE / (1024 * 1024));
+    cJSON_AddItemToArray(formats, jpeg_batch_format);
+
+    cJSON* tensor_batch_format = cJSON_CreateObject();
+    cJSON_AddStringToObject(tensor_batch_format, "endpoint", "/inference-tensor-batch");
+    cJSON_AddStringToObject(tensor_batch_format, "method", "POST");
+    cJSON_AddStringToObject(tensor_batch_format, "content_type", "multipart/mixed");
+    cJSON_AddStringToObject(tensor_batch_format, "description", "Multiple RGB tensors, one per part (X-Image-Index part header)");
+    cJSON_AddNumberToObject(tensor_batch_format, "max_batch_size", MAX_BATCH_SIZE);
+    cJSON_AddNumberToObject(tensor_batch_format, "max_size_mb", MAX_IMAGE_SIZE / (1024 * 1024));
+    cJSON_AddItemToArray(formats, tensor_batch_format);
+
     cJSON_AddItemToObject(model, "input_formats", formats);
 
     // Class labels
@@ -177,17 +203,148 @@ static void http_health(ACAP_HTTP_Response response, const ACAP_HTTP_Request req
     cJSON_Delete(resp_json);
 }
 
-// Helper function to process inference request and send response
-static void process_and_respond(ACAP_HTTP_Response response, InferenceRequest* request) {
-    // Wait for processing to complete
+// Block until the worker thread has processed a queued request
+static void wait_for_request(InferenceRequest* request) {
     pthread_mutex_lock(&request->lock);
     while (!request->processed) {
         pthread_cond_wait(&request->done, &request->lock);
     }
     pthread_mutex_unlock(&request->lock);
+}
+
+// Get minimum confidence from query string (optional, format: ?conf=F)
+static double get_min_confidence(const ACAP_HTTP_Request request) {
+    if (request->queryString) {
+        const char* conf_param = strstr(request->queryString, "conf=");
+        if (conf_param) {
+            return atof(conf_param + 5);
+        }
+    }
+    return 0.0;
+}
+
+// Remove detections below a per-request confidence threshold
+static void filter_detections(cJSON* detections, double min_confidence) {
+    if (!detections || min_confidence <= 0.0) {
+        return;
+    }
+
+    cJSON* detection = detections->child;
+    while (detection) {
+        cJSON* next = detection->next;
+        cJSON* confidence = cJSON_GetObjectItem(detection, "confidence");
+        if (cJSON_IsNumber(confidence) && confidence->valuedouble < min_confidence) {
+            cJSON_Delete(cJSON_DetachItemViaPointer(detections, detection));
+        }
+        detection = next;
+    }
+}
+
+// Apply the per-request confidence threshold to a processed request
+static void apply_min_confidence(InferenceRequest* request, double min_confidence) {
+    if (request->status_code != 200 || !request->response_data) {
+        return;
+    }
+
+    cJSON* detections = (cJSON*)request->response_data;
+    filter_detections(detections, min_confidence);
+    if (cJSON_GetArraySize(detections) == 0) {
+        request->status_code = 204;
+    }
+}
+
+// Check whether the client asked for the packed binary detection format
+static bool wants_binary(const ACAP_HTTP_Request request) {
+    const char* accept = FCGX_GetParam("HTTP_ACCEPT", request->request->envp);
+    return accept && strstr(accept, "application/octet-stream") != NULL;
+}
+
+// Convert a float to IEEE 754 half precision (round to nearest)
+static uint16_t float_to_half(float value) {
+    union { float f; uint32_t u; } bits = { value };
+    uint32_t sign = (bits.u >> 16) & 0x8000;
+    int32_t exponent = (int32_t)((bits.u >> 23) & 0xff) - 127 + 15;
+    uint32_t mantissa = bits.u & 0x7fffff;
+
+    if (exponent >= 31) {
+        return (uint16_t)(sign | 0x7c00);  // Overflow: infinity
+    }
+    if (exponent <= 0) {
+        if (exponent < -10) {
+            return (uint16_t)sign;  // Underflow: zero
+        }
+        mantissa |= 0x800000;
+        uint32_t shift = (uint32_t)(14 - exponent);
+        return (uint16_t)(sign | ((mantissa + (1u << (shift - 1))) >> shift));
+    }
+    // Rounding may carry into the exponent, which is still correct
+    return (uint16_t)(sign | (((uint32_t)exponent << 10) + ((mantissa + 0x1000) >> 13)));
+}
+
+static void put_u16(uint8_t* out, uint16_t value) {
+    out[0] = (uint8_t)(value & 0xff);
+    out[1] = (uint8_t)(value >> 8);
+}
+
+// Send detections as packed little-endian records of 12 bytes each:
+// uint16 class_id, float16 confidence, float16 x, y, w, h (bbox_pixels).
+// Image dimensions are sent in the X-Image-Width/X-Image-Height headers.
+static void respond_binary_detections(ACAP_HTTP_Response response, const InferenceRequest* request,
+                                      cJSON* detections) {
+    int count = cJSON_GetArraySize(detections);
+    size_t size = (size_t)count * 12;
+    uint8_t* body = malloc(size);
+    if (!body) {
+        ACAP_HTTP_Respond_Error(response, 500, "Internal Server Error: Out of memory");
+        return;
+    }
+
+    uint8_t* record = body;
+    cJSON* detection;
+    cJSON_ArrayForEach(detection, detections) {
+        cJSON* class_id = cJSON_GetObjectItem(detection, "class_id");
+        cJSON* confidence = cJSON_GetObjectItem(detection, "confidence");
+        cJSON* bbox = cJSON_GetObjectItem(detection, "bbox_pixels");
+
+        // 0xffff: label without a class id (class_id -1 in the JSON format)
+        put_u16(record, cJSON_IsNumber(class_id) && class_id->valueint >= 0
+                        ? (uint16_t)class_id->valueint : 0xffff);
+        put_u16(record + 2, float_to_half(cJSON_IsNumber(confidence) ? (float)confidence->valuedouble : 0.0f));
+
+        const char* keys[] = { "x", "y", "w", "h" };
+        for (int i = 0; i < 4; i++) {
+            cJSON* value = bbox ? cJSON_GetObjectItem(bbox, keys[i]) : NULL;
+            put_u16(record + 4 + i * 2, float_to_half(cJSON_IsNumber(value) ? (float)value->valuedouble : 0.0f));
+        }
+        record += 12;
+    }
+
+    ACAP_HTTP_Respond_String(response,
+        "Status: 200 OK\r\n"
+        "Content-Type: application/octet-stream\r\n"
+        "Content-Length: %zu\r\n"
+        "X-Image-Width: %d\r\n"
+        "X-Image-Height: %d\r\n"
+        "Cache-Control: no-cache\r\n\r\n",
+        size, request->image_width, request->image_height);
+    ACAP_HTTP_Respond_Data(response, size, body);
+    free(body);
+}
+
+// Helper function to process inference request and send response
+static void process_and_respond(ACAP_HTTP_Response response, InferenceRequest* request,
+                                double min_confidence, bool binary) {
+    // Wait for processing to complete
+    wait_for_request(request);
+    apply_min_confidence(request, min_confidence);
 
     // Send response based on status
-    if (request->status_code == 200) {
+    if (request->status_code == 200 && binary) {
+        // Detections found, packed format requested via Accept header
+        respond_binary_detections(response, request, (cJSON*)request->response_data);
+        cJSON_Delete((cJSON*)request->response_data);
+        request->response_data = NULL;
+    } else if (request->status_code == 200) {
         // Detections found
         cJSON* resp_json = cJSON_CreateObject();
         cJSON_AddItemToObject(resp_json, "detections", (cJSON*)request->response_data);
@@ -285,7 +442,7 @@ static void http_inference_jpeg(ACAP_HTTP_Response response, const ACAP_HTTP_Req
         return;
     }
 
-    process_and_respond(response, inf_request);
+    process_and_respond(response, inf_request, get_min_confidence(request), wants_binary(request));
 }
 
 // POST /inference/tensor - Process pre-processed tensor inference
@@ -353,7 +510,249 @@ static void http_inference_tensor(ACAP_HTTP_Response response, const ACAP_HTTP_R
         return;
     }
 
-    process_and_respond(response, inf_request);
+    process_and_respond(response, inf_request, get_min_confidence(request), wants_binary(request));
+}
+
+// One part of a multipart batch request (points into the request body, no copies)
+typedef struct {
+    const uint8_t* data;
+    size_t size;
+    int image_index;
+    char content_type[64];
+} BatchPart;
+
+// Extract the boundary parameter from a multipart Content-Type header
+static bool get_multipart_boundary(const char* content_type, char* boundary, size_t boundary_size) {
+    const char* param = strstr(content_type, "boundary=");
+    if (!param) {
+        return false;
+    }
+    param += 9;
+    if (*param == '"') {
+        param++;
+    }
+
+    size_t len = strcspn(param, "\";");
+    if (len == 0 || len >= boundary_size) {
+        return false;
+    }
+
+    memcpy(boundary, param, len);
+    boundary[len] = '\0';
+    return true;
+}
+
+// Parse Content-Type and X-Image-Index from a part header block
+static void parse_part_headers(const uint8_t* headers, size_t size, BatchPart* part) {
+    char buffer[1024];
+    if (size >= sizeof(buffer)) {
+        size = sizeof(buffer) - 1;
+    }
+    memcpy(buffer, headers, size);
+    buffer[size] = '\0';
+
+    char* saveptr = NULL;
+    for (char* line = strtok_r(buffer, "\r\n", &saveptr); line; line = strtok_r(NULL, "\r\n", &saveptr)) {
+        if (strncasecmp(line, "Content-Type:", 13) == 0) {
+            const char* value = line + 13;
+            while (*value == ' ') value++;
+            snprintf(part->content_type, sizeof(part->content_type), "%s", value);
+        } else if (strncasecmp(line, "X-Image-Index:", 14) == 0) {
+            part->image_index = atoi(line + 14);
+        }
+    }
+}
+
+// Split a multipart/mixed body into parts. Returns number of parts, or -1 on malformed input.
+static int parse_multipart(const uint8_t* body, size_t body_size, const char* boundary,
+                           BatchPart* parts, int max_parts) {
+    char delimiter[128];
+    int delimiter_len = snprintf(delimiter, sizeof(delimiter), "--%s", boundary);
+    if (delimiter_len <= 2 || delimiter_len >= (int)sizeof(delimiter)) {
+        return -1;
+    }
+
+    const uint8_t* end = body + body_size;
+    const uint8_t* pos = memmem(body, body_size, delimiter, delimiter_len);
+    int count = 0;
+
+    while (pos) {
+        pos += delimiter_len;
+
+        // Closing delimiter ("--boundary--")
+        if (end - pos >= 2 && pos[0] == '-' && pos[1] == '-') {
+            break;
+        }
+        if (end - pos < 2 || pos[0] != '\r' || pos[1] != '\n') {
+            return -1;
+        }
+        pos += 2;
+
+        const uint8_t* headers_end = memmem(pos, end - pos, "\r\n\r\n", 4);
+        if (!headers_end) {
+            return -1;
+        }
+        const uint8_t* part_data = headers_end + 4;
+
+        // Part data runs up to the CRLF preceding the next delimiter
+        const uint8_t* next = memmem(part_data, end - part_data, delimiter, delimiter_len);
+        if (!next || next - part_data < 2 || next[-2] != '\r' || next[-1] != '\n') {
+            return -1;
+        }
+        if (count >= max_parts) {
+            return -1;
+        }
+
+        BatchPart* part = &parts[count++];
+        part->data = part_data;
+        part->size = (next - 2) - part_data;
+        part->image_index = -1;
+        part->content_type[0] = '\0';
+        parse_part_headers(pos, headers_end - pos, part);
+
+        pos = next;
+    }
+
+    return count;
+}
+
+// Queue one batch part and wait for its result. Returns a cJSON result object for the part.
+static cJSON* process_batch_part(const BatchPart* part, const char* part_type,
+                                 double min_confidence) {
+    cJSON* item = cJSON_CreateObject();
+    cJSON_AddNumberToObject(item, "index", part->image_index);
+
+    if (part->content_type[0] && strncmp(part->content_type, part_type, strlen(part_type)) != 0) {
+        cJSON_AddNumberToObject(item, "status", 400);
+        cJSON_AddStringToObject(item, "error", "Unexpected part Content-Type");
+        return item;
+    }
+
+    if (part->size == 0 || part->size > MAX_IMAGE_SIZE) {
+        cJSON_AddNumberToObject(item, "status", 400);
+        cJSON_AddStringToObject(item, "error", "Invalid part size");
+        return item;
+    }
+
+    int width, height;
+    if (strcmp(part_type, "image/jpeg") == 0) {
+        if (!JPEG_GetDimensions(part->data, part->size, &width, &height)) {
+            cJSON_AddNumberToObject(item, "status", 400);
+            cJSON_AddStringToObject(item, "error", "Invalid JPEG image");
+            return item;
+        }
+    } else {
+        width = Model_GetWidth();
+        height = Model_GetHeight();
+        if (part->size != (size_t)(width * height * 3)) {
+            cJSON_AddNumberToObject(item, "status", 400);
+            cJSON_AddStringToObject(item, "error", "Invalid tensor size");
+            return item;
+        }
+    }
+
+    InferenceRequest* inf_request = Server_CreateRequest(part->data, part->size, part_type,
+                                                         part->image_index, width, height);
+    if (!inf_request) {
+        cJSON_AddNumberToObject(item, "status", 500);
+        cJSON_AddStringToObject(item, "error", "Failed to create request");
+        return item;
+    }
+
+    if (!Server_QueueRequest(inf_request)) {
+        Server_FreeRequest(inf_request);
+        cJSON_AddNumberToObject(item, "status", 503);
+        cJSON_AddStringToObject(item, "error", "Queue full");
+        return item;
+    }
+
+    wait_for_request(inf_request);
+    apply_min_confidence(inf_request, min_confidence);
+
+    cJSON_AddNumberToObject(item, "status", inf_request->status_code);
+    if (inf_request->status_code == 200) {
+        cJSON_AddItemToObject(item, "detections", (cJSON*)inf_request->response_data);
+        inf_request->response_data = NULL; // Transfer ownership
+    } else if (inf_request->status_code == 204) {
+        cJSON_AddArrayToObject(item, "detections");
+    } else if (inf_request->status_code == 400 && inf_request->response_data) {
+        char* error_msg = (char*)inf_request->response_data;
+        cJSON_AddStringToObject(item, "error", error_msg);
+        free(error_msg);
+        inf_request->response_data = NULL;
+    } else {
+        cJSON_AddStringToObject(item, "error", "Inference failed");
+    }
+
+    Server_FreeRequest(inf_request);
+    return item;
+}
+
+// Shared handler for the batch endpoints. Parts are run through the regular queue
+// one at a time, so a batch never holds more than one queue slot.
+static void http_inference_batch(ACAP_HTTP_Response response, const ACAP_HTTP_Request request,
+                                 const char* part_type) {
+    const char* content_type = request->contentType;
+
+    // Validate content type
+    if (!content_type || strncmp(content_type, "multipart/mixed", 15) != 0) {
+        ACAP_HTTP_Respond_Error(response, 400, "Bad Request: Content-Type must be multipart/mixed");
+        return;
+    }
+
+    char boundary[72];
+    if (!get_multipart_boundary(content_type, boundary, sizeof(boundary))) {
+        ACAP_HTTP_Respond_Error(response, 400, "Bad Request: Missing multipart boundary");
+        return;
+    }
+
+    // Read request body
+    const uint8_t* body_data = (const uint8_t*)request->postData;
+    size_t body_size = request->postDataLength;
+
+    if (!body_data || body_size == 0) {
+        ACAP_HTTP_Respond_Error(response, 400, "Bad Request: Empty body");
+        return;
+    }
+
+    BatchPart parts[MAX_BATCH_SIZE];
+    int num_parts = parse_multipart(body_data, body_size, boundary, parts, MAX_BATCH_SIZE);
+    if (num_parts < 0) {
+        ACAP_HTTP_Respond_Error(response, 400, "Bad Request: Malformed multipart body or too many parts");
+        return;
+    }
+    if (num_parts == 0) {
+        ACAP_HTTP_Respond_Error(response, 400, "Bad Request: No parts in batch");
+        return;
+    }
+
+    // Check if queue is full
+    if (Server_IsQueueFull()) {
+        ACAP_HTTP_Respond_Error(response, 503, "Service Unavailable: Queue full (max 3 concurrent requests)");
+        return;
+    }
+
+    double min_confidence = get_min_confidence(request);
+
+    cJSON* results = cJSON_CreateArray();
+    for (int i = 0; i < num_parts; i++) {
+        cJSON_AddItemToArray(results, process_batch_part(&parts[i], part_type, min_confidence));
+    }
+
+    cJSON* resp_json = cJSON_CreateObject();
+    cJSON_AddItemToObject(resp_json, "results", results);
+    ACAP_HTTP_Respond_JSON(response, resp_json);
+    cJSON_Delete(resp_json);
+}
+
+// POST /inference-jpeg-batch - Process multiple JPEG images in one request
+static void http_inference_jpeg_batch(ACAP_HTTP_Response response, const ACAP_HTTP_Request request) {
+    http_inference_batch(response, request, "image/jpeg");
+}
+
+// POST /inference-tensor-batch - Process multiple pre-processed tensors in one request
+static void http_inference_tensor_batch(ACAP_HTTP_Response response, const ACAP_HTTP_Request request) {
+    http_inference_batch(response, request, "application/octet-stream");
 }
 
 // GET /monitor - Serve monitoring HTML page
@@ -460,6 +859,8 @@ int main(void) {
     ACAP_HTTP_Node("capabilities", http_capabilities);
     ACAP_HTTP_Node("inference-jpeg", http_inference_jpeg);
     ACAP_HTTP_Node("inference-tensor", http_inference_tensor);
+    ACAP_HTTP_Node("inference-jpeg-batch", http_inference_jpeg_batch);
+    ACAP_HTTP_Node("inference-tensor-batch", http_inference_tensor_batch);
     ACAP_HTTP_Node("health", http_health);
     ACAP_HTTP_Node("monitor", http_monitor);
     ACAP_HTTP_Node("monitor-latest", http_monitor_latest);
@@ -2,14 +2,14 @@
 
 # Usage: ./build.sh [--clean]
 # --clean: Force rebuild without cache (slower but ensures fresh build)
-# default: Use cache (faster, TensorFlow only downloaded once)
+# default: Use cache (faster, Python tooling only downloaded once)
 
 CACHE_FLAG=""
 if [ "$1" = "--clean" ]; then
     CACHE_FLAG="--no-cache"
-    echo "Clean build (no cache) - TensorFlow will be downloaded"
+    echo "Clean build (no cache) - Python tooling will be downloaded"
 else
-    echo "Cached build - reusing TensorFlow layer"
+    echo "Cached build - reusing Python tooling layer"
 fi
 
 echo ""
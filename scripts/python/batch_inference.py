@@ -7,69 +7,352 @@ Includes error handling, retry logic, and progress tracking.
 """
 
 import os
+import queue
+import threading
 import time
-import json
 from pathlib import Path
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import numpy as np
 from tqdm import tqdm
 
-from inference_client import InferenceClient
+from inference_client import InferenceClient, json_dumps
 
 
-def process_single_image(client: InferenceClient, image_path: str, index: int, max_retries: int = 3) -> Dict:
+def process_single_image(
+    client: InferenceClient,
+    image_path: str,
+    index: int,
+    image_data: Optional[bytes] = None
+) -> Dict:
     """
-    Process a single image with retry logic.
+    Process a single image.
+    Busy (503) responses are retried by the client's HTTP adapter.
 
     Args:
         client: InferenceClient instance
         image_path: Path to image
         index: Image index
-        max_retries: Maximum number of retry attempts
+        image_data: Optional JPEG data already read from image_path
 
     Returns:
         Dictionary with results or error information
     """
+    try:
+        start_time = time.time()
+        if image_data is not None:
+            detections = client.infer_jpeg_data(image_data, image_index=index)
+        else:
+            detections = client.infer_jpeg(image_path, image_index=index)
+        inference_time = time.time() - start_time
+
+        return {
+            'index': index,
+            'image': os.path.basename(image_path),
+            'success': True,
+            'detections': detections,
+            'inference_time': inference_time
+        }
+
+    except Exception as e:
+        return {
+            'index': index,
+            'image': os.path.basename(image_path),
+            'success': False,
+            'error': str(e)
+        }
+
+
+def process_batch(
+    client: InferenceClient,
+    batch: List[Tuple[int, str, bytes]],
+    max_retries: int = 3
+) -> List[Dict]:
+    """
+    Process a group of images with one batch request, retrying busy images.
+    Busy responses to the whole request are retried by the client's HTTP
+    adapter; images the server reports busy inside the batch are resent here.
+
+    Args:
+        client: InferenceClient instance
+        batch: List of (index, image_path, jpeg_data) tuples
+        max_retries: Maximum number of retry attempts
+
+    Returns:
+        List of result dictionaries (same format as process_single_image),
+        plus 'attempts': batch requests issued here for the image (retries
+        of a busy whole request inside the HTTP adapter are not counted)
+    """
+    paths = {index: image_path for index, image_path, _ in batch}
+    images = {index: image_data for index, _, image_data in batch}
+    pending = [index for index, _, _ in batch]
+    results = []
+
     for attempt in range(max_retries):
         try:
             start_time = time.time()
-            detections = client.infer_jpeg(image_path, image_index=index)
-            inference_time = time.time() - start_time
+            batch_results = client.infer_jpeg_data_batch(
+                [images[index] for index in pending], pending
+            )
+            inference_time = (time.time() - start_time) / len(pending)
+        except Exception as e:
+            for index in pending:
+                results.append({
+                    'index': index,
+                    'image': os.path.basename(paths[index]),
+                    'success': False,
+                    'error': str(e),
+                    'attempts': attempt + 1
+                })
+            return results
+
+        # Match results by index; images missing from the response fail
+        by_index = {item.get('index'): item for item in batch_results}
+        busy = []
+        for index in pending:
+            item = by_index.get(index)
+            if item is None:
+                results.append({
+                    'index': index,
+                    'image': os.path.basename(paths[index]),
+                    'success': False,
+                    'error': 'No result returned for image',
+                    'attempts': attempt + 1
+                })
+            elif item['status'] in (200, 204):
+                results.append({
+                    'index': index,
+                    'image': os.path.basename(paths[index]),
+                    'success': True,
+                    'detections': item.get('detections', []),
+                    'inference_time': inference_time,
+                    'attempts': attempt + 1
+                })
+            elif item['status'] == 503:
+                busy.append(index)
+            else:
+                results.append({
+                    'index': index,
+                    'image': os.path.basename(paths[index]),
+                    'success': False,
+                    'error': item.get('error', f"HTTP {item['status']}"),
+                    'attempts': attempt + 1
+                })
+
+        if not busy:
+            return results
+
+        pending = busy
+        if attempt < max_retries - 1:
+            time.sleep(0.5 * (attempt + 1))  # Exponential backoff
+
+    for index in pending:
+        results.append({
+            'index': index,
+            'image': os.path.basename(paths[index]),
+            'success': False,
+            'error': 'Max retries exceeded',
+            'attempts': max_retries
+        })
+    return results
+
+
+def prefetch_file(image_path: str) -> None:
+    """Ask the kernel to start reading a file into the page cache."""
+    try:
+        fd = os.open(image_path, os.O_RDONLY)
+    except OSError:
+        return  # Reported when the decoder opens it
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def make_worker(
+    client: InferenceClient,
+    max_retries: int = 3,
+    single: bool = False
+) -> Callable[[List[Tuple[int, str, bytes]]], List[Dict]]:
+    """
+    Build the inference function for a batch of (index, image_path, image_data)
+    entries, with the client and settings bound once rather than per call.
 
-            return {
-                'index': index,
-                'image': os.path.basename(image_path),
-                'success': True,
-                'detections': detections,
-                'inference_time': inference_time,
-                'attempts': attempt + 1
-            }
+    Args:
+        client: InferenceClient instance
+        max_retries: Maximum number of retry attempts per image
+        single: Send each (one-entry) batch to the single-image endpoint
 
-        except Exception as e:
-            error_msg = str(e)
+    Returns:
+        Function taking a batch and returning one result dictionary per image
+    """
+    if single:
+        def _worker(batch: List[Tuple[int, str, bytes]]) -> List[Dict]:
+            index, image_path, image_data = batch[0]
+            return [process_single_image(client, image_path, index, image_data)]
+    else:
+        def _worker(batch: List[Tuple[int, str, bytes]]) -> List[Dict]:
+            return process_batch(client, batch, max_retries)
+    return _worker
 
-            # If server is busy, wait and retry
-            if 'busy' in error_msg.lower() or '503' in error_msg:
-                if attempt < max_retries - 1:
-                    time.sleep(0.5 * (attempt + 1))  # Exponential backoff
-                    continue
 
-            # Other errors
-            return {
+class AdaptiveBatcher:
+    """
+    Pipelines image decoding and inference, grouping images into batch requests.
+
+    Submitted images are read (and converted to JPEG if needed) on a pool of
+    decoder threads, which feed a bounded queue. A dispatcher thread waits for
+    a free network worker, then collects decoded images until max_batch are
+    waiting or max_wait_ms has passed since the first one, and sends them as
+    one request. Decoding of later images overlaps with inference of earlier
+    ones, and while all workers are busy the next batch fills up.
+
+    Where os.posix_fadvise is available, a prefetch thread asks the kernel to
+    read files up to `prefetch` images ahead of the decoders, so cold reads
+    overlap with decoding instead of stalling it.
+    """
+
+    def __init__(
+        self,
+        client: InferenceClient,
+        max_batch: int = 8,
+        max_wait_ms: float = 20,
+        num_workers: int = 3,
+        max_retries: int = 3,
+        num_decoders: Optional[int] = None,
+        prefetch: int = 16
+    ):
+        """
+        Args:
+            client: InferenceClient instance
+            max_batch: Maximum images per request (1 uses the single-image endpoint)
+            max_wait_ms: Maximum time to wait for a batch to fill
+            num_workers: Number of requests in flight
+            max_retries: Maximum number of retry attempts per image
+            num_decoders: Number of decoder threads (default: CPU count)
+            prefetch: Files to read ahead of the decoders (0 disables)
+        """
+        self.client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._infer = make_worker(client, max_retries, single=(max_batch == 1))
+
+        # Bounded so decoders stay at most a couple of batches per worker ahead
+        self._queue = queue.Queue(maxsize=2 * num_workers * max_batch)
+        self._slots = threading.Semaphore(num_workers)
+        self._decoders = ThreadPoolExecutor(max_workers=num_decoders or os.cpu_count())
+        self._executor = ThreadPoolExecutor(max_workers=num_workers)
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+        # Read-ahead runs at most `prefetch` files ahead of decoding: each
+        # decode releases one slot for the prefetcher
+        self._prefetcher = None
+        if prefetch > 0 and hasattr(os, 'posix_fadvise'):
+            self._prefetch_queue = queue.Queue()
+            self._prefetch_slots = threading.Semaphore(prefetch)
+            self._prefetcher = threading.Thread(target=self._prefetch, daemon=True)
+            self._prefetcher.start()
+
+    def submit(self, image_path: str, index: int) -> Future:
+        """Queue an image; the returned future resolves to its result dictionary."""
+        future = Future()
+        if self._prefetcher is not None:
+            self._prefetch_queue.put(image_path)
+        self._decoders.submit(self._decode, index, image_path, future)
+        return future
+
+    def close(self) -> None:
+        """Flush pending images and wait for all batches to finish."""
+        self._decoders.shutdown(wait=True)
+        if self._prefetcher is not None:
+            self._prefetch_queue.put(None)
+            self._prefetcher.join()
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'AdaptiveBatcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _prefetch(self) -> None:
+        while True:
+            image_path = self._prefetch_queue.get()
+            if image_path is None:
+                break
+            self._prefetch_slots.acquire()
+            prefetch_file(image_path)
+
+    def _decode(self, index: int, image_path: str, future: Future) -> None:
+        if self._prefetcher is not None:
+            self._prefetch_slots.release()
+        try:
+            image_data = self.client.read_jpeg(image_path)
+        except Exception as e:
+            future.set_result({
                 'index': index,
                 'image': os.path.basename(image_path),
                 'success': False,
-                'error': error_msg,
-                'attempts': attempt + 1
-            }
-
-    return {
-        'index': index,
-        'image': os.path.basename(image_path),
-        'success': False,
-        'error': 'Max retries exceeded',
-        'attempts': max_retries
-    }
+                'error': str(e)
+            })
+            return
+        self._queue.put((index, image_path, image_data, future))
+
+    def _dispatch(self) -> None:
+        closed = False
+        while not closed:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            self._slots.acquire()
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[int, str, bytes, Future]]) -> None:
+        futures = {index: future for index, _, _, future in batch}
+        error = 'No result returned for image'
+        try:
+            results = self._infer(
+                [(index, image_path, image_data) for index, image_path, image_data, _ in batch]
+            )
+            for result in results:
+                future = futures.get(result['index'])
+                if future is not None and not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            error = str(e)
+        finally:
+            # Every future must complete, or batch_inference waits forever
+            for index, image_path, _, future in batch:
+                if not future.done():
+                    future.set_result({
+                        'index': index,
+                        'image': os.path.basename(image_path),
+                        'success': False,
+                        'error': error
+                    })
+            self._slots.release()
 
 
 def batch_inference(
@@ -77,7 +360,12 @@ def batch_inference(
     image_dir: str,
     output_file: str = None,
     num_workers: int = 3,
-    image_extensions: List[str] = ['.jpg', '.jpeg', '.png']
+    image_extensions: List[str] = ['.jpg', '.jpeg', '.png'],
+    batch_size: int = 8,
+    max_wait_ms: float = 20,
+    num_decoders: Optional[int] = None,
+    save_detections: bool = False,
+    prefetch: int = 16
 ) -> Dict:
     """
     Process all images in a directory.
@@ -88,6 +376,11 @@ def batch_inference(
         output_file: Optional JSON output file path
         num_workers: Number of parallel workers (should match server queue size)
         image_extensions: List of image file extensions to process
+        batch_size: Maximum images per HTTP request (1 uses the single-image endpoint)
+        max_wait_ms: Maximum time to wait for a batch to fill
+        save_detections: Keep each image's detection dicts in the results
+                         (otherwise only its detection count is kept)
+        prefetch: Files to read ahead of decoding (0 disables)
 
     Returns:
         Dictionary with aggregated results and statistics
@@ -106,52 +399,93 @@ def batch_inference(
         print(f"No images found in {image_dir}")
         return {}
 
-    print(f"Processing {total_images} images with {num_workers} workers...")
+    print(f"Processing {total_images} images with {num_workers} workers "
+          f"(batch size {batch_size})...")
 
-    # Process images in parallel
+    # Process images in parallel. Per-image statistics are kept in arrays
+    # indexed by image index rather than re-scanned from the result dicts.
     results = []
+    success = np.zeros(total_images, dtype=bool)
+    inference_times = np.zeros(total_images, dtype=np.float32)
+    num_detections = np.zeros(total_images, dtype=np.int32)
+    class_ids = []
+    class_labels = {}    # class_id -> label, taken from the detections
+    unknown_counts = {}  # Labels without a class id (class_id -1)
     start_time = time.time()
 
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        # Submit all tasks
-        futures = {
-            executor.submit(process_single_image, client, str(img_path), idx): idx
-            for idx, img_path in enumerate(image_files)
-        }
+    # Submit all tasks (decoding runs ahead of inference on its own pool)
+    executor = AdaptiveBatcher(
+        client,
+        max_batch=batch_size,
+        max_wait_ms=max_wait_ms,
+        num_workers=num_workers,
+        num_decoders=num_decoders,
+        prefetch=prefetch
+    )
+    futures = [
+        executor.submit(str(img_path), idx)
+        for idx, img_path in enumerate(image_files)
+    ]
 
+    with executor:
         # Process results with progress bar
+        success_count = 0
         with tqdm(total=total_images, desc="Processing") as pbar:
             for future in as_completed(futures):
                 result = future.result()
                 results.append(result)
+                if result['success']:
+                    index = result['index']
+                    detections = result['detections']
+                    success[index] = True
+                    inference_times[index] = result['inference_time']
+                    num_detections[index] = len(detections)
+                    ids = np.fromiter(
+                        (d['class_id'] for d in detections), dtype=np.int64, count=len(detections)
+                    )
+                    class_ids.append(ids)
+                    # Walk the dicts only for ids without a known label yet
+                    if not class_labels.keys() >= set(ids.tolist()):
+                        for d in detections:
+                            if d['class_id'] < 0:
+                                unknown_counts[d['label']] = unknown_counts.get(d['label'], 0) + 1
+                            else:
+                                class_labels.setdefault(d['class_id'], d['label'])
+                    if not save_detections:
+                        del result['detections']
+                        result['num_detections'] = len(detections)
+                    success_count += 1
                 pbar.update(1)
 
                 # Update progress bar description with success rate
-                success_count = sum(1 for r in results if r['success'])
                 pbar.set_postfix({'success': f"{success_count}/{len(results)}"})
 
     total_time = time.time() - start_time
 
-    # Sort results by index
+    # Sort results by index (positions now match the statistics arrays)
     results.sort(key=lambda x: x['index'])
 
     # Calculate statistics
-    successful = [r for r in results if r['success']]
-    failed = [r for r in results if not r['success']]
+    num_successful = int(success.sum())
+    failed = [results[i] for i in np.flatnonzero(~success).tolist()]
 
-    total_detections = sum(len(r.get('detections', [])) for r in successful)
-    avg_inference_time = sum(r['inference_time'] for r in successful) / len(successful) if successful else 0
+    total_detections = int(num_detections.sum())
+    avg_inference_time = float(inference_times[success].mean()) if num_successful else 0
 
-    # Count detections by class
+    # Count detections by class; labels without a class id were counted above
     class_counts = {}
-    for result in successful:
-        for det in result.get('detections', []):
-            label = det['label']
-            class_counts[label] = class_counts.get(label, 0) + 1
+    all_class_ids = np.concatenate(class_ids) if class_ids else np.empty(0, dtype=np.int64)
+    all_class_ids = all_class_ids[all_class_ids >= 0]
+    if len(all_class_ids):
+        counts = np.bincount(all_class_ids)
+        for class_id in np.flatnonzero(counts).tolist():
+            class_counts[class_labels[class_id]] = int(counts[class_id])
+    for label, count in unknown_counts.items():
+        class_counts[label] = class_counts.get(label, 0) + count
 
     stats = {
         'total_images': total_images,
-        'successful': len(successful),
+        'successful': num_successful,
         'failed': len(failed),
         'total_detections': total_detections,
         'total_time_seconds': total_time,
@@ -189,8 +523,9 @@ def batch_inference(
 
     # Save results to JSON
     if output_file:
-        with open(output_file, 'w') as f:
-            json.dump(output, f, indent=2)
+        # json_dumps may leave non-ASCII labels unescaped (orjson)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(json_dumps(output))
         print(f"\nResults saved to {output_file}")
 
     return output
@@ -230,6 +565,18 @@ if __name__ == "__main__":
     parser.add_argument('--password', default='pass', help='Camera password')
     parser.add_argument('--output', help='Output JSON file path')
     parser.add_argument('--workers', type=int, default=3, help='Number of parallel workers')
+    parser.add_argument('--http2', action='store_true',
+                        help='Multiplex requests over one HTTP/2 connection (requires httpx[http2])')
+    parser.add_argument('--batch-size', type=int, default=8,
+                        help='Maximum images per request; 1 uses the single-image endpoint (default: 8)')
+    parser.add_argument('--max-wait-ms', type=float, default=20,
+                        help='Maximum time to wait for a batch to fill (default: 20)')
+    parser.add_argument('--decoders', type=int, default=None,
+                        help='Threads reading/encoding images (default: CPU count)')
+    parser.add_argument('--prefetch', type=int, default=16,
+                        help='Image files to read ahead of the decoders (default: 16, 0 disables)')
+    parser.add_argument('--save-detections', action='store_true',
+                        help='Include every detection in the output JSON (default: counts only)')
 
     args = parser.parse_args()
 
@@ -237,7 +584,8 @@ if __name__ == "__main__":
     client = InferenceClient(
         host=args.host,
         username=args.username,
-        password=args.password
+        password=args.password,
+        http2=args.http2
     )
 
     # Run batch inference
@@ -245,5 +593,10 @@ if __name__ == "__main__":
         client=client,
         image_dir=args.image_dir,
         output_file=args.output,
-        num_workers=args.workers
+        num_workers=args.workers,
+        batch_size=args.batch_size,
+        max_wait_ms=args.max_wait_ms,
+        num_decoders=args.decoders,
+        save_detections=args.save_detections,
+        prefetch=args.prefetch
     )
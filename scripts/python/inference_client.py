@@ -16,6 +16,12 @@ Usage examples:
       --index 0 \
       /path/to/image.jpg
 
+  # Several images in one batch request
+  python3 inference_client.py \
+      --host 192.168.1.100 \
+      --mode batch \
+      /path/to/a.jpg /path/to/b.png
+
   # PNG file with tensor inference
   python3 inference_client.py \
       --host 192.168.1.100 \
@@ -26,15 +32,16 @@ Usage examples:
 
 Arguments:
   positional:
-    image                 Path to the input image (JPEG, PNG, BMP, etc.)
+    image                 Path(s) to the input image(s) (JPEG, PNG, BMP, etc.)
 
   options:
     -H, --host            Camera IP or hostname (required)
     -u, --username        Username for camera auth (optional)
     -p, --password        Password for camera auth (optional)
-    -m, --mode            Inference mode: jpeg, tensor, or both (default: both)
+    -m, --mode            Inference mode: jpeg, tensor, both, or batch (default: both)
     -i, --index           Image index metadata sent to server (default: 0)
     -c, --confidence      Minimum confidence threshold 0.0-1.0 (default: 0.0)
+    --http2               Use HTTP/2 via httpx (server must accept cleartext HTTP/2)
 
 This script talks to an Axis camera inference server at /local/detectx
 and runs JPEG and/or tensor inference on the provided image using the model
@@ -44,32 +51,269 @@ configured on the camera.
 import argparse
 import io
 import json
+import os
+import queue
 import sys
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from collections import Counter
 
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPDigestAuth
+from urllib3.util.retry import Retry
 from PIL import Image
 
+try:
+    import cv2
+except ImportError:  # Optional: faster preprocessing
+    cv2 = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+except ImportError:  # Optional: faster JPEG encoding of non-JPEG inputs
+    TurboJPEG = None
+
+try:
+    import httpx
+except ImportError:  # Optional: HTTP/2 backend (pip install httpx[http2])
+    httpx = None
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON decoding and encoding
+    orjson = None
+
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj) -> str:
+        """Serialize obj to indented JSON text."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> str:
+        """Serialize obj to indented JSON text."""
+        return json.dumps(obj, indent=2)
+
+
+# Numba letterbox kernel, compiled on first use only when OpenCV is absent
+# (None: not built yet, False: Numba is not installed)
+_letterbox_kernel = None
+
+
+def _get_letterbox_kernel():
+    """Return the Numba letterbox kernel, or None if Numba is not installed."""
+    global _letterbox_kernel
+    if _letterbox_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:  # Optional: fused letterbox kernel when OpenCV is absent
+            _letterbox_kernel = False
+            return None
+
+        @njit(parallel=True, fastmath=True, cache=True)
+        def _letterbox_resize(src, dst, new_w, new_h, offset_x, offset_y):
+            """Bilinear resize of src written directly into dst at the offset."""
+            src_h, src_w = src.shape[0], src.shape[1]
+            fx = src_w / new_w
+            fy = src_h / new_h
+            for y in prange(new_h):
+                # Pixel-center mapping, as OpenCV INTER_LINEAR
+                sy = max((y + 0.5) * fy - 0.5, 0.0)
+                y0 = min(int(sy), src_h - 1)
+                y1 = min(y0 + 1, src_h - 1)
+                wy = sy - y0
+                for x in range(new_w):
+                    sx = max((x + 0.5) * fx - 0.5, 0.0)
+                    x0 = min(int(sx), src_w - 1)
+                    x1 = min(x0 + 1, src_w - 1)
+                    wx = sx - x0
+                    for c in range(3):
+                        top = src[y0, x0, c] * (1.0 - wx) + src[y0, x1, c] * wx
+                        bottom = src[y1, x0, c] * (1.0 - wx) + src[y1, x1, c] * wx
+                        dst[offset_y + y, offset_x + x, c] = np.uint8(
+                            min(top * (1.0 - wy) + bottom * wy + 0.5, 255.0)
+                        )
+
+        _letterbox_kernel = _letterbox_resize
+    return _letterbox_kernel or None
+
+
+# Server reads at most 11MB of request body; leave room for multipart framing
+MAX_BATCH_BYTES = 10 * 1024 * 1024
+
+# Server limit on parts per batch request (MAX_BATCH_SIZE in main.c)
+MAX_BATCH_SIZE = 32
+
+# Packed detection record returned for "Accept: application/octet-stream"
+# (little-endian, 12 bytes; box is bbox_pixels, top-left in image pixels)
+BINARY_DETECTION_DTYPE = np.dtype([
+    ('cls', '<u2'), ('conf', '<f2'),
+    ('x', '<f2'), ('y', '<f2'), ('w', '<f2'), ('h', '<f2'),
+])
+
+# Packed class id for a label the server could not map (class_id -1 in JSON)
+BINARY_UNKNOWN_CLASS = 0xFFFF
+
 
 class InferenceClient:
     """Client for Axis Camera Inference Server"""
 
-    def __init__(self, host: str, username: str = None, password: str = None):
+    def __init__(
+        self,
+        host: str,
+        username: str = None,
+        password: str = None,
+        max_retries: int = 3,
+        http2: bool = False
+    ):
         """
         Initialize the inference client.
 
+        The client can be shared by worker threads; each thread gets its
+        own keep-alive session, so threads never contend for one
+        connection pool (or, with http2, all threads share one
+        multiplexed connection).
+
         Args:
             host: Camera IP or hostname (e.g., "192.168.1.100")
             username: Optional digest auth username
             password: Optional digest auth password
+            max_retries: Retries for busy (503) responses, with backoff
+            http2: Send all requests over one multiplexed HTTP/2 connection
+                   with httpx instead of per-thread HTTP/1.1 sessions. The
+                   server must accept cleartext HTTP/2 (h2c).
         """
         self.base_url = f"http://{host}/local/detectx"
         self.auth = HTTPDigestAuth(username, password) if username and password else None
-        self.session = requests.Session()
+        self.max_retries = max_retries
+        self._local = threading.local()
+
+        # Optional HTTP/2 client shared by all threads (None: use requests)
+        self._httpx = None
+        if http2:
+            if httpx is None:
+                raise ImportError("HTTP/2 requires httpx: pip install httpx[http2]")
+            # http1=False: plain http:// has no ALPN, so speak HTTP/2 directly
+            self._httpx = httpx.Client(
+                http1=False,
+                http2=True,
+                auth=httpx.DigestAuth(username, password) if username and password else None,
+                limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+                timeout=None,
+            )
+
+        # libjpeg-turbo encoder for non-JPEG inputs (None: use Pillow)
+        self._tj = None
+        if TurboJPEG is not None:
+            try:
+                self._tj = TurboJPEG()
+            except (OSError, RuntimeError):  # Python package without the shared library
+                self._tj = None
+
+        # Reusable upload buffers shared by worker threads
+        self._buf_pool = queue.LifoQueue()
+        self._bytesio_pool = queue.LifoQueue()
+
+        # Class names for decoding binary responses (fetched on first use)
+        self._class_names = None
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session for the calling thread (created on first use)."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._make_session()
+        return session
+
+    def _make_session(self) -> requests.Session:
+        """Create a keep-alive session with one pooled connection."""
+        session = requests.Session()
+
+        # One thread uses this session, so one connection is enough. Let
+        # urllib3 retry busy responses with exponential backoff (0.5s, 1s, 2s, ...)
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=0.5,
+            status_forcelist=[503],
+            allowed_methods=frozenset(['GET', 'POST']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+        session.mount('http://', adapter)
+        return session
+
+    def _get(self, url: str):
+        """Send a GET request with the configured backend."""
+        if self._httpx is None:
+            return self.session.get(url, auth=self.auth)
+        return self._send_httpx('GET', url)
+
+    def _post(self, url: str, data: Union[bytes, bytearray, memoryview], headers: Dict[str, str]):
+        """Send a POST request with the configured backend."""
+        if self._httpx is None:
+            return self.session.post(url, data=data, headers=headers, auth=self.auth)
+        # httpx treats any non-bytes body as an iterable of chunks
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        return self._send_httpx('POST', url, content=data, headers=headers)
+
+    def _send_httpx(self, method: str, url: str, **kwargs):
+        """Send an httpx request, retrying busy (503) responses with backoff."""
+        for attempt in range(self.max_retries + 1):
+            response = self._httpx.request(method, url, **kwargs)
+            if response.status_code != 503 or attempt == self.max_retries:
+                return response
+            time.sleep(0.5 * 2 ** attempt)
+
+    def _get_buf(self, size: int) -> bytearray:
+        """Take a pooled bytearray of at least size bytes (or allocate one)."""
+        try:
+            buf = self._buf_pool.get_nowait()
+        except queue.Empty:
+            return bytearray(size)
+        if len(buf) < size:
+            return bytearray(size)
+        return buf
+
+    def _put_buf(self, buf: bytearray) -> None:
+        """Return a bytearray to the pool."""
+        self._buf_pool.put(buf)
+
+    def _get_bytesio(self) -> io.BytesIO:
+        """Take a pooled BytesIO (or create one), positioned at the start."""
+        try:
+            buffer = self._bytesio_pool.get_nowait()
+        except queue.Empty:
+            return io.BytesIO()
+        buffer.seek(0)
+        return buffer
+
+    def _put_bytesio(self, buffer: io.BytesIO) -> None:
+        """Return a BytesIO to the pool."""
+        self._bytesio_pool.put(buffer)
+
+    def _inference_url(
+        self, endpoint: str, image_index: int = -1, min_confidence: float = 0.0
+    ) -> str:
+        """Build an inference URL with optional index and conf query parameters."""
+        params = []
+        if image_index >= 0:
+            params.append(f"index={image_index}")
+        if min_confidence > 0.0:
+            params.append(f"conf={min_confidence}")
+
+        url = f"{self.base_url}/{endpoint}"
+        if params:
+            url += "?" + "&".join(params)
+        return url
 
     def get_capabilities(self) -> Dict:
         """
@@ -79,10 +323,20 @@ class InferenceClient:
             Dictionary with model info, input formats, and classes
         """
         url = f"{self.base_url}/capabilities"
-        response = self.session.get(url, auth=self.auth)
+        response = self._get(url)
         response.raise_for_status()
         return response.json()
 
+    def get_class_names(self) -> List[str]:
+        """Return the model class names, indexed by class_id (cached)."""
+        if self._class_names is None:
+            classes = self.get_capabilities()['model']['classes']
+            names = [''] * len(classes)
+            for c in classes:
+                names[c['id']] = c['name']
+            self._class_names = names
+        return self._class_names
+
     def get_health(self) -> Dict:
         """
         Get server health and statistics.
@@ -91,11 +345,70 @@ class InferenceClient:
             Dictionary with server status and statistics
         """
         url = f"{self.base_url}/health"
-        response = self.session.get(url, auth=self.auth)
+        response = self._get(url)
         response.raise_for_status()
         return response.json()
 
-    def infer_jpeg(self, image_path: str, image_index: int = -1) -> List[Dict]:
+    def read_jpeg(self, image_path: str) -> bytes:
+        """
+        Read an image file as JPEG bytes.
+        JPEG files are read as-is; other formats are converted in memory.
+
+        Args:
+            image_path: Path to image file (JPEG, PNG, BMP, etc.)
+
+        Returns:
+            JPEG encoded image data
+        """
+        with self._jpeg_data(image_path) as image_data:
+            return bytes(image_data)
+
+    @contextmanager
+    def _jpeg_data(self, image_path: str) -> Iterator[Union[bytes, memoryview]]:
+        """
+        Yield JPEG data for an image file. Converted images are encoded into
+        a pooled buffer, so the yielded view is only valid inside the block.
+        """
+        # Fast path: files named .jpg/.jpeg are sent as-is without a Pillow
+        # header probe, provided they start with the JPEG SOI marker
+        if os.path.splitext(image_path)[1].lower() in ('.jpg', '.jpeg'):
+            with open(image_path, 'rb') as f:
+                image_data = f.read()
+            if image_data[:2] == b'\xff\xd8':
+                yield image_data
+                return
+
+        # Check if image needs conversion to JPEG
+        img = Image.open(image_path)
+        if img.format == 'JPEG':
+            # Already JPEG, read directly
+            with open(image_path, 'rb') as f:
+                yield f.read()
+            return
+
+        # Convert to RGB if needed (PNG might have alpha channel)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+
+        if self._tj is not None:
+            # libjpeg-turbo SIMD color conversion and DCT
+            rgb = np.asarray(img if img.mode == 'RGB' else img.convert('RGB'))
+            yield self._tj.encode(rgb, quality=95, pixel_format=TJPF_RGB)
+            return
+
+        # Convert to JPEG in memory. The pooled buffer is overwritten from the
+        # start rather than truncated, so its allocation is kept for reuse.
+        buffer = self._get_bytesio()
+        try:
+            img.save(buffer, format='JPEG', quality=95)
+            with buffer.getbuffer() as view, view[:buffer.tell()] as image_data:
+                yield image_data
+        finally:
+            self._put_bytesio(buffer)
+
+    def infer_jpeg(
+        self, image_path: str, image_index: int = -1, min_confidence: float = 0.0
+    ) -> List[Dict]:
         """
         Perform inference on a JPEG image.
         Automatically converts non-JPEG formats (PNG, BMP, etc.) to JPEG.
@@ -103,6 +416,9 @@ class InferenceClient:
         Args:
             image_path: Path to image file (JPEG, PNG, BMP, etc.)
             image_index: Optional image index for dataset validation
+            min_confidence: Optional threshold applied by the server before
+                            the response is sent, and again to the response
+                            (0.0 = server default)
 
         Returns:
             List of detections, each containing:
@@ -115,35 +431,42 @@ class InferenceClient:
 
         Raises:
             requests.HTTPError: If inference fails
+            httpx.HTTPStatusError: If inference fails (http2 backend)
         """
-        url = f"{self.base_url}/inference-jpeg"
-        if image_index >= 0:
-            url += f"?index={image_index}"
+        with self._jpeg_data(image_path) as image_data:
+            return self.infer_jpeg_data(image_data, image_index, min_confidence)
+
+    def infer_jpeg_data(
+        self,
+        image_data: Union[bytes, memoryview],
+        image_index: int = -1,
+        min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """
+        Perform inference on JPEG encoded image data already in memory.
 
-        # Check if image needs conversion to JPEG
-        img = Image.open(image_path)
-        if img.format != 'JPEG':
-            # Convert to JPEG in memory
-            buffer = io.BytesIO()
-            # Convert to RGB if needed (PNG might have alpha channel)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            img.save(buffer, format='JPEG', quality=95)
-            image_data = buffer.getvalue()
-        else:
-            # Already JPEG, read directly
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+        Args:
+            image_data: JPEG image data (e.g. from read_jpeg)
+            image_index: Optional image index for dataset validation
+            min_confidence: Optional confidence threshold, applied by the server
+                            and again to the response
+
+        Returns:
+            List of detections (same format as infer_jpeg)
+
+        Raises:
+            requests.HTTPError: If inference fails
+            httpx.HTTPStatusError: If inference fails (http2 backend)
+        """
+        url = self._inference_url("inference-jpeg", image_index, min_confidence)
 
         headers = {'Content-Type': 'image/jpeg'}
 
-        response = self.session.post(
-            url, data=image_data, headers=headers, auth=self.auth
-        )
+        response = self._post(url, image_data, headers)
 
         # Handle different status codes
         if response.status_code == 200:
-            return response.json()['detections']
+            return filter_by_confidence(json_loads(response.content)['detections'], min_confidence)
         elif response.status_code == 204:
             return []  # No detections
         elif response.status_code == 503:
@@ -151,8 +474,104 @@ class InferenceClient:
         else:
             response.raise_for_status()
 
+    def infer_jpeg_binary(
+        self, image_path: str, image_index: int = -1, min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """
+        Perform JPEG inference using the packed binary response format.
+
+        Detections arrive as fixed 12-byte records and are filtered by
+        confidence as one array before any dicts are built, which is much
+        cheaper than JSON for responses with many detections. Confidence
+        and box values are float16, so boxes are rounded to the pixel
+        (2 px steps beyond 2048). Falls back to JSON if the server does
+        not support the binary format.
+
+        Args:
+            image_path: Path to image file (JPEG, PNG, BMP, etc.)
+            image_index: Optional image index for dataset validation
+            min_confidence: Confidence threshold applied by the server and
+                            again to the decoded records
+
+        Returns:
+            List of detections (same format as infer_jpeg)
+
+        Raises:
+            requests.HTTPError: If inference fails
+            httpx.HTTPStatusError: If inference fails (http2 backend)
+        """
+        url = self._inference_url("inference-jpeg", image_index, min_confidence)
+
+        headers = {
+            'Content-Type': 'image/jpeg',
+            'Accept': 'application/octet-stream, application/json;q=0.5',
+        }
+
+        with self._jpeg_data(image_path) as image_data:
+            response = self._post(url, image_data, headers)
+
+        if response.status_code == 200:
+            if not response.headers.get('Content-Type', '').startswith('application/octet-stream'):
+                # Older server: ignored the Accept header and sent JSON
+                return filter_by_confidence(json_loads(response.content)['detections'], min_confidence)
+            return self._decode_binary_detections(response, image_index, min_confidence)
+        elif response.status_code == 204:
+            return []
+        elif response.status_code == 503:
+            raise Exception("Server busy - queue full")
+        else:
+            response.raise_for_status()
+
+    def _decode_binary_detections(
+        self, response, image_index: int, min_confidence: float
+    ) -> List[Dict]:
+        """Decode a packed binary response into detection dicts."""
+        records = np.frombuffer(response.content, dtype=BINARY_DETECTION_DTYPE)
+        if min_confidence > 0.0:
+            records = records[records['conf'] >= np.float16(min_confidence)]
+        if len(records) == 0:
+            return []
+
+        width = int(response.headers['X-Image-Width'])
+        height = int(response.headers['X-Image-Height'])
+        names = self.get_class_names()
+
+        # Widen once, then derive both box formats for all records together
+        x = records['x'].astype(np.float32)
+        y = records['y'].astype(np.float32)
+        w = records['w'].astype(np.float32)
+        h = records['h'].astype(np.float32)
+        pixels = np.rint(np.stack([x, y, w, h], axis=1)).astype(np.int32).tolist()
+        yolo = np.stack(
+            [(x + w / 2) / width, (y + h / 2) / height, w / width, h / height], axis=1
+        ).tolist()
+
+        class_ids = records['cls'].astype(np.int32)
+        class_ids[records['cls'] == BINARY_UNKNOWN_CLASS] = -1
+
+        detections = []
+        for class_id, confidence, (px, py, pw, ph), (cx, cy, nw, nh) in zip(
+            class_ids.tolist(), records['conf'].astype(np.float32).tolist(), pixels, yolo
+        ):
+            # The packed format carries no label text, so unmapped classes
+            # cannot report their label
+            if 0 <= class_id < len(names):
+                label = names[class_id]
+            else:
+                label = 'unknown'
+            detections.append({
+                'index': image_index,
+                'image': {'width': width, 'height': height},
+                'label': label,
+                'class_id': class_id,
+                'confidence': confidence,
+                'bbox_pixels': {'x': px, 'y': py, 'w': pw, 'h': ph},
+                'bbox_yolo': {'x': cx, 'y': cy, 'w': nw, 'h': nh},
+            })
+        return detections
+
     def infer_tensor(
-        self, rgb_array: np.ndarray, image_index: int = -1
+        self, rgb_array: np.ndarray, image_index: int = -1, min_confidence: float = 0.0
     ) -> List[Dict]:
         """
         Perform inference on a preprocessed RGB tensor.
@@ -161,6 +580,8 @@ class InferenceClient:
             rgb_array: NumPy array with shape (height, width, 3) and dtype uint8
                       Must match model input dimensions (typically 640x640x3)
             image_index: Optional image index for dataset validation
+            min_confidence: Optional confidence threshold, applied by the server
+                            and again to the response
 
         Returns:
             List of detections (same format as infer_jpeg)
@@ -168,10 +589,9 @@ class InferenceClient:
         Raises:
             ValueError: If array dimensions don't match model requirements
             requests.HTTPError: If inference fails
+            httpx.HTTPStatusError: If inference fails (http2 backend)
         """
-        url = f"{self.base_url}/inference-tensor"
-        if image_index >= 0:
-            url += f"?index={image_index}"
+        url = self._inference_url("inference-tensor", image_index, min_confidence)
 
         # Validate array shape
         if rgb_array.ndim != 3 or rgb_array.shape[2] != 3:
@@ -180,26 +600,211 @@ class InferenceClient:
         if rgb_array.dtype != np.uint8:
             raise ValueError(f"Expected dtype uint8, got {rgb_array.dtype}")
 
-        # Convert to bytes (RGB interleaved)
-        tensor_bytes = rgb_array.tobytes()
+        size = rgb_array.nbytes
+        headers = {
+            'Content-Type': 'application/octet-stream',
+            'Content-Length': str(size),
+        }
+
+        # C-contiguous arrays are already RGB interleaved and are sent without
+        # copying; others (slices, flips) are copied into a pooled buffer
+        if rgb_array.flags['C_CONTIGUOUS']:
+            with memoryview(rgb_array).cast('B') as tensor_data:
+                response = self._post(url, tensor_data, headers)
+        else:
+            buf = self._get_buf(size)
+            try:
+                np.frombuffer(buf, dtype=np.uint8, count=size).reshape(rgb_array.shape)[...] = rgb_array
+                with memoryview(buf)[:size] as tensor_data:
+                    response = self._post(url, tensor_data, headers)
+            finally:
+                self._put_buf(buf)
+
+        if response.status_code == 200:
+            return filter_by_confidence(json_loads(response.content)['detections'], min_confidence)
+        elif response.status_code == 204:
+            return []
+        elif response.status_code == 503:
+            raise Exception("Server busy - queue full")
+        else:
+            response.raise_for_status()
+
+    def infer_jpeg_batch(
+        self,
+        image_paths: List[str],
+        image_indices: Optional[List[int]] = None,
+        min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """
+        Perform inference on several images with one HTTP request per batch.
+        Images are sent as parts of a multipart/mixed body to /inference-jpeg-batch.
+        Batches larger than the server body limit are split automatically.
+
+        Args:
+            image_paths: Paths to image files (JPEG, PNG, BMP, etc.)
+            image_indices: Optional image indices, one per path (default: position)
+            min_confidence: Optional confidence threshold, applied by the server
+                            and again to the response
+
+        Returns:
+            List of per-image results in input order, each containing:
+                - index: Image index
+                - status: Per-image HTTP-style status (200, 204, 400, 503, 500)
+                - detections: List of detections (status 200/204)
+                - error: Error message (other statuses)
+
+        Raises:
+            requests.HTTPError: If the batch request fails
+            httpx.HTTPStatusError: If the batch request fails (http2 backend)
+        """
+        return self.infer_jpeg_data_batch(
+            [self.read_jpeg(path) for path in image_paths], image_indices, min_confidence
+        )
+
+    def infer_jpeg_data_batch(
+        self,
+        images: List[bytes],
+        image_indices: Optional[List[int]] = None,
+        min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """
+        Perform batch inference on JPEG encoded image data already in memory.
+
+        Args:
+            images: JPEG image data, one entry per image (e.g. from read_jpeg)
+            image_indices: Optional image indices, one per image (default: position)
+            min_confidence: Optional confidence threshold, applied by the server
+                            and again to the response
+
+        Returns:
+            List of per-image results (same format as infer_jpeg_batch)
+
+        Raises:
+            requests.HTTPError: If the batch request fails
+            httpx.HTTPStatusError: If the batch request fails (http2 backend)
+        """
+        if image_indices is None:
+            image_indices = list(range(len(images)))
+
+        parts = list(zip(images, image_indices))
+        return self._post_batch(
+            "inference-jpeg-batch", parts, 'image/jpeg', min_confidence
+        )
+
+    def infer_tensor_batch(
+        self,
+        rgb_arrays: List[np.ndarray],
+        image_indices: Optional[List[int]] = None,
+        min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """
+        Perform inference on several preprocessed RGB tensors in one request.
 
-        headers = {'Content-Type': 'application/octet-stream'}
+        Args:
+            rgb_arrays: NumPy arrays with shape (height, width, 3) and dtype uint8
+            image_indices: Optional image indices, one per array (default: position)
+            min_confidence: Optional confidence threshold, applied by the server
+                            and again to the response
+
+        Returns:
+            List of per-image results (same format as infer_jpeg_batch)
 
-        response = self.session.post(
-            url, data=tensor_bytes, headers=headers, auth=self.auth
+        Raises:
+            ValueError: If array dimensions don't match model requirements
+            requests.HTTPError: If the batch request fails
+            httpx.HTTPStatusError: If the batch request fails (http2 backend)
+        """
+        if image_indices is None:
+            image_indices = list(range(len(rgb_arrays)))
+
+        parts = []
+        for rgb_array, index in zip(rgb_arrays, image_indices):
+            if rgb_array.ndim != 3 or rgb_array.shape[2] != 3:
+                raise ValueError(f"Expected shape (H, W, 3), got {rgb_array.shape}")
+            if rgb_array.dtype != np.uint8:
+                raise ValueError(f"Expected dtype uint8, got {rgb_array.dtype}")
+            parts.append((memoryview(np.ascontiguousarray(rgb_array)).cast('B'), index))
+
+        return self._post_batch(
+            "inference-tensor-batch", parts, 'application/octet-stream', min_confidence
         )
 
+    def _post_batch(
+        self,
+        endpoint: str,
+        parts: List[Tuple[bytes, int]],
+        content_type: str,
+        min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """
+        POST (data, index) parts as multipart/mixed, splitting into several
+        requests when the server body or part limits would be exceeded.
+        """
+        results = []
+        chunk = []
+        chunk_bytes = 0
+
+        for data, index in parts:
+            if chunk and (chunk_bytes + len(data) > MAX_BATCH_BYTES
+                          or len(chunk) >= MAX_BATCH_SIZE):
+                results.extend(self._post_multipart(
+                    endpoint, chunk, content_type, min_confidence
+                ))
+                chunk = []
+                chunk_bytes = 0
+            chunk.append((data, index))
+            chunk_bytes += len(data)
+
+        if chunk:
+            results.extend(self._post_multipart(
+                endpoint, chunk, content_type, min_confidence
+            ))
+
+        return results
+
+    def _post_multipart(
+        self,
+        endpoint: str,
+        parts: List[Tuple[bytes, int]],
+        content_type: str,
+        min_confidence: float = 0.0
+    ) -> List[Dict]:
+        """Send one multipart/mixed batch request and return its per-part results."""
+        url = self._inference_url(endpoint, min_confidence=min_confidence)
+        boundary = uuid.uuid4().hex
+
+        body = bytearray()
+        for data, index in parts:
+            body += (
+                f"--{boundary}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"X-Image-Index: {index}\r\n\r\n"
+            ).encode('ascii')
+            body += data
+            body += b"\r\n"
+        body += f"--{boundary}--\r\n".encode('ascii')
+
+        headers = {'Content-Type': f'multipart/mixed; boundary={boundary}'}
+
+        response = self._post(url, body, headers)
+
         if response.status_code == 200:
-            return response.json()['detections']
-        elif response.status_code == 204:
-            return []
+            results = json_loads(response.content)['results']
+            if min_confidence > 0.0:
+                for result in results:
+                    if 'detections' in result:
+                        result['detections'] = filter_by_confidence(result['detections'], min_confidence)
+            return results
         elif response.status_code == 503:
             raise Exception("Server busy - queue full")
         else:
             response.raise_for_status()
 
     def preprocess_image_to_tensor(
-        self, image_path: str, target_size: Tuple[int, int] = (640, 640)
+        self,
+        image_path: str,
+        target_size: Tuple[int, int] = (640, 640),
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Preprocess an image to tensor format with letterboxing.
@@ -207,33 +812,82 @@ class InferenceClient:
         This applies the same preprocessing the server does for JPEG inputs,
         allowing you to use the faster tensor endpoint.
 
+        Uses OpenCV when installed, otherwise a Numba kernel if Numba is
+        installed (both resize directly into the letterbox buffer), and
+        falls back to Pillow.
+
         Args:
             image_path: Path to image file
             target_size: Target (width, height), default (640, 640)
+            out: Optional uint8 array with shape (height, width, 3) to write
+                 into, so a buffer can be reused across calls
 
         Returns:
             NumPy array with shape (height, width, 3) ready for tensor inference
         """
-        img = Image.open(image_path).convert('RGB')
+        target_w, target_h = target_size
+        img = self._load_rgb(image_path)
+        height, width = img.shape[:2]
 
         # Calculate scale to maintain aspect ratio
-        scale = min(target_size[0] / img.width, target_size[1] / img.height)
-        new_w = int(img.width * scale)
-        new_h = int(img.height * scale)
-
-        # Resize image
-        img_resized = img.resize((new_w, new_h), Image.BILINEAR)
-
-        # Create black background
-        result = Image.new('RGB', target_size, (0, 0, 0))
-
-        # Paste resized image centered
-        offset_x = (target_size[0] - new_w) // 2
-        offset_y = (target_size[1] - new_h) // 2
-        result.paste(img_resized, (offset_x, offset_y))
-
-        # Convert to numpy array
-        return np.array(result, dtype=np.uint8)
+        scale = min(target_w / width, target_h / height)
+        new_w = int(width * scale)
+        new_h = int(height * scale)
+
+        offset_x = (target_w - new_w) // 2
+        offset_y = (target_h - new_h) // 2
+
+        # Create black background. A reused buffer only needs its borders
+        # cleared, since the image region is overwritten below.
+        if out is None:
+            out = np.zeros((target_h, target_w, 3), dtype=np.uint8)
+        elif out.shape != (target_h, target_w, 3) or out.dtype != np.uint8:
+            raise ValueError(f"Expected out with shape {(target_h, target_w, 3)} and dtype uint8")
+        else:
+            out[:offset_y] = 0
+            out[offset_y + new_h:] = 0
+            out[offset_y:offset_y + new_h, :offset_x] = 0
+            out[offset_y:offset_y + new_h, offset_x + new_w:] = 0
+
+        # Resize image centered into the background
+        region = out[offset_y:offset_y + new_h, offset_x:offset_x + new_w]
+
+        if cv2 is not None:
+            cv2.resize(img, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+        elif _get_letterbox_kernel() is not None:
+            _letterbox_kernel(img, out, new_w, new_h, offset_x, offset_y)
+        else:
+            resized = Image.fromarray(img).resize((new_w, new_h), Image.BILINEAR)
+            region[...] = np.asarray(resized)
+
+        return out
+
+    @staticmethod
+    def _load_rgb(image_path: str) -> np.ndarray:
+        """Load an image file as an RGB uint8 array."""
+        if cv2 is not None:
+            # Ignore EXIF orientation, as Pillow and the server's decoder do
+            img = cv2.imread(image_path, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+            if img is not None:
+                return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        # Pillow handles formats OpenCV can't read (GIF, some PNG variants)
+        return np.asarray(Image.open(image_path).convert('RGB'))
+
+
+def filter_by_confidence(detections: List[Dict], threshold: float) -> List[Dict]:
+    """
+    Keep detections with confidence >= threshold.
+    Confidences are compared as one NumPy array rather than per dict.
+    """
+    if threshold <= 0.0 or not detections:
+        return detections
+
+    confidences = np.fromiter(
+        (d['confidence'] for d in detections), dtype=np.float32, count=len(detections)
+    )
+    keep = np.nonzero(confidences >= np.float32(threshold))[0]
+    return [detections[i] for i in keep.tolist()]
 
 
 def parse_args() -> argparse.Namespace:
@@ -243,7 +897,8 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument(
         "image",
-        help="Path to input image (JPEG or any format Pillow can open)"
+        nargs="+",
+        help="Path(s) to input image(s) (JPEG or any format Pillow can open)"
     )
 
     parser.add_argument(
@@ -266,9 +921,9 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument(
         "--mode", "-m",
-        choices=["jpeg", "tensor", "both"],
+        choices=["jpeg", "tensor", "both", "batch"],
         default="both",
-        help="Inference mode: jpeg, tensor, or both (default: both)"
+        help="Inference mode: jpeg, tensor, both, or batch (default: both)"
     )
 
     parser.add_argument(
@@ -285,6 +940,12 @@ def parse_args() -> argparse.Namespace:
         help="Minimum confidence threshold (0.0-1.0, default: 0.0 shows all)"
     )
 
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 via httpx (server must accept cleartext HTTP/2)"
+    )
+
     return parser.parse_args()
 
 
@@ -296,6 +957,7 @@ def main() -> None:
         host=args.host,
         username=args.username,
         password=args.password,
+        http2=args.http2,
     )
 
     # Get server capabilities
@@ -314,17 +976,40 @@ def main() -> None:
     print(f"Total requests: {health['statistics']['total_requests']}")
     print()
 
-    image_path = args.image
+    image_path = args.image[0]
+
+    if args.mode == "batch":
+        print("=== Batch JPEG Inference ===")
+        indices = [args.index + i for i in range(len(args.image))]
+        start_time = time.time()
+        results = client.infer_jpeg_batch(
+            args.image, indices, min_confidence=args.confidence
+        )
+        inference_time_ms = (time.time() - start_time) * 1000
+
+        print(f"Inference time: {inference_time_ms:.1f} ms for {len(results)} images")
+        for path, result in zip(args.image, results):
+            if result['status'] not in (200, 204):
+                print(f"  {path}: error {result['status']} ({result.get('error', 'unknown')})")
+                continue
+
+            detections = filter_by_confidence(result['detections'], args.confidence)
+            print(f"  {path}: {len(detections)} objects (confidence >= {args.confidence:.0%})")
+            for det in detections:
+                print(f"    - {det['label']}: {det['confidence']:.2%}")
+        print()
+        return
 
     if args.mode in ("jpeg", "both"):
         print("=== JPEG Inference ===")
         start_time = time.time()
-        detections = client.infer_jpeg(image_path, image_index=args.index)
+        detections = client.infer_jpeg(
+            image_path, image_index=args.index, min_confidence=args.confidence
+        )
         inference_time_ms = (time.time() - start_time) * 1000
 
-        # Filter by confidence threshold
-        if args.confidence > 0.0:
-            detections = [d for d in detections if d['confidence'] >= args.confidence]
+        # Filter by confidence threshold (servers without ?conf= support)
+        detections = filter_by_confidence(detections, args.confidence)
 
         print(f"Inference time: {inference_time_ms:.1f} ms")
         print(f"Found {len(detections)} objects (confidence >= {args.confidence:.0%}):")
@@ -355,12 +1040,13 @@ def main() -> None:
         print(f"Preprocessing time: {preprocess_time_ms:.1f} ms")
 
         inference_start = time.time()
-        detections = client.infer_tensor(tensor, image_index=args.index)
+        detections = client.infer_tensor(
+            tensor, image_index=args.index, min_confidence=args.confidence
+        )
         inference_time_ms = (time.time() - inference_start) * 1000
 
-        # Filter by confidence threshold
-        if args.confidence > 0.0:
-            detections = [d for d in detections if d['confidence'] >= args.confidence]
+        # Filter by confidence threshold (servers without ?conf= support)
+        detections = filter_by_confidence(detections, args.confidence)
 
         print(f"Inference time: {inference_time_ms:.1f} ms")
         print(f"Total time: {preprocess_time_ms + inference_time_ms:.1f} ms")